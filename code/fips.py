@@ -6,6 +6,7 @@ Created at 1/20/21
 Moving frame and the target(s) inside it
 """
 from psychopy import visual
+from time import perf_counter
 
 
 class FIPS:
@@ -24,6 +25,7 @@ class FIPS:
             refresh_rate=60,
             flash_frames=5,
             name=None,
+            profiler=None,
     ):
 
         self.win = win
@@ -35,6 +37,7 @@ class FIPS:
         self.refresh_rate = refresh_rate
         self.flash_frames = flash_frames
         self.name = name
+        self.profiler = profiler  # profiling.StimProfiler, records the construction time and method calls of the stimuli
 
         # we want the flashes inside the frame
         if self.path_length >= self.size:
@@ -61,6 +64,7 @@ class FIPS:
         """
         if self._fixation is None:
 
+            t0 = perf_counter()
             self._fixation = visual.Circle(
                 win=self.win,
                 size=self.size/20,
@@ -68,6 +72,7 @@ class FIPS:
                 lineColor=(-1, -1, -1),
                 pos=(0, 0)
             )
+            self._built("fixation", t0)
         
         return self._fixation
 
@@ -82,6 +87,8 @@ class FIPS:
         """
         if self._frame is None:
 
+            t0 = perf_counter()
+
             # corner coordinates
             top_left = (self.pos[0] - self.size/2, self.pos[1] + self.size/2)
             top_right = (self.pos[0] + self.size/2, self.pos[1] + self.size/2)
@@ -109,6 +116,7 @@ class FIPS:
                     autoLog=False,
                     autoDraw=False
             )
+            self._built("frame", t0)
 
         return self._frame
 
@@ -121,6 +129,7 @@ class FIPS:
         -------
         """
         if self._probes is None:
+            t0 = perf_counter()
             self._probes = dict()
             top_pos = self.pos[1] + self.size/6 + self.size/12
             bot_pos = (self.pos[1] - self.size/2) + self.size/6 + self.size/12
@@ -149,9 +158,31 @@ class FIPS:
                 contrast=self.contrast*.8,  # contrast 80% of the frame
                 color='red'
             )
+            self._built("probes", t0)
 
         return self._probes
 
+    def _built(self, stim_name, t0):
+        """
+        Records the construction time and, only now that the stimulus exists, times its methods
+        """
+        if self.profiler is None:
+            return
+
+        self.profiler.built(stim_name, perf_counter() - t0)
+        if stim_name == "probes":
+            for key, probe in self._probes.items():
+                self.profiler.instrument(probe, ["draw"], prefix=f"probes.{key}.")
+        else:
+            methods = ["draw", "contains"] if stim_name == "fixation" else ["draw"]
+            self.profiler.instrument(getattr(self, f"_{stim_name}"), methods, prefix=f"{stim_name}.")
+
+    def prebuild(self):
+        """
+        Constructs all the stimuli now so that their first use in the trial loop does not pay for it
+        """
+        return self.fixation, self.frame, self.probes
+
     def move_frame(self, scr_frame, sequence):
         """
         Oscillates the frame
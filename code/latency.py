@@ -0,0 +1,113 @@
+#!usr/bin/env python
+"""
+Created at 10/19/26
+@author: devxl
+
+Sample-to-photon timing of the gaze-contingent display changes
+"""
+from psychopy import core
+import pandas as pd
+import numpy as np
+
+
+class GazeLatencyLog:
+    """
+    Tags each gaze-contingent display change with the time of the tracker sample that triggered it, the time the
+    trial loop observed that sample and the time of the flip that showed the change, all on the ioHub time base.
+    Times are read with core.getTime, which is the clock ioHub stamps samples with, so no time is spent on a round
+    trip to the ioHub server.
+    """
+
+    def __init__(self):
+        self.records = []
+
+        self._trial = None
+        self._pending = None
+
+    def start_trial(self, **trial_info):
+        """
+        Starts a new trial, the keyword arguments are written with the trial's record
+        """
+        self._trial = trial_info
+        self._pending = None
+
+    @property
+    def tagged(self):
+        """
+        Whether the current trial already has a display change
+        """
+        return self._pending is not None
+
+    def tag(self, sample, change="target_off"):
+        """
+        Tags the display change triggered by a tracker sample, call as soon as the loop acts on the sample
+
+        Parameters
+        ----------
+        sample
+            the sample the loop acted on, as returned by utils.read_sample
+        change : str
+            name of the display change
+        """
+        if not (hasattr(sample, "time") and hasattr(sample, "device_time")):
+            raise ValueError(f"Cannot tag a display change with sample {sample!r}, it has no time and device_time.")
+
+        self._pending = {
+            **(self._trial or {}),
+            "change": change,
+            "sample_device_time": sample.device_time,
+            "sample_time": sample.time,
+            "observed_time": core.getTime(),
+            "flip_time": np.nan,
+        }
+
+    def flipped(self):
+        """
+        Closes the tagged display change. Register with win.callOnFlip(log.flipped) when tagging, so the time is
+        read inside the flip that shows the change rather than after win.flip() returns.
+        """
+        if self._pending is None or not np.isnan(self._pending["flip_time"]):
+            return
+
+        self._pending["flip_time"] = core.getTime()
+        self.records.append(self._pending)
+
+    @property
+    def last_latency(self):
+        """
+        Sample-to-photon latency (s) of the last completed display change
+        """
+        if not self.records:
+            return np.nan
+        return self.records[-1]["flip_time"] - self.records[-1]["sample_time"]
+
+    def to_frame(self):
+        """
+        Returns
+        -------
+        pd.DataFrame
+            one row per display change with the latency components in seconds
+        """
+        df = pd.DataFrame(self.records)
+        if df.empty:
+            return df
+
+        df["sample_to_observe"] = df["observed_time"] - df["sample_time"]
+        df["observe_to_flip"] = df["flip_time"] - df["observed_time"]
+        df["sample_to_photon"] = df["flip_time"] - df["sample_time"]
+
+        return df
+
+    def save(self, file_name):
+        self.to_frame().to_csv(file_name, index=False)
+
+    def summary(self):
+        """
+        Distribution of the latency components in ms
+        """
+        df = self.to_frame()
+        if df.empty:
+            return df
+
+        cols = ["sample_to_observe", "observe_to_flip", "sample_to_photon"]
+        return (df[cols] * 1000).describe(percentiles=[.5, .9, .95, .99])
@@ -0,0 +1,155 @@
+#!usr/bin/env python
+"""
+Created at 10/19/26
+@author: devxl
+
+Opt-in profiling of the stimulus lifecycle and the trial loop
+"""
+from time import perf_counter
+from functools import wraps
+import cProfile
+import pstats
+import pandas as pd
+
+
+class StimProfiler:
+    """
+    Call counts and cumulative time per method. Nothing is patched unless instrument() is called, so a session
+    without a profiler runs the original methods.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.builds = []
+        self._patched = []
+
+    def add(self, name, duration):
+        counter = self.counters.setdefault(name, [0, 0.0])
+        counter[0] += 1
+        counter[1] += duration
+
+    def built(self, stim_name, duration):
+        """
+        Records a stimulus construction with the number of win.flip calls before it, so a build that lands in the
+        trial loop shows up at its frame (needs the window's flip instrumented first)
+        """
+        self.add(f"build.{stim_name}", duration)
+        self.builds.append({
+            "name": stim_name,
+            "duration_ms": duration * 1000,
+            "frame": self.counters.get("win.flip", [0])[0],
+        })
+
+    def wrap(self, func, name):
+        """
+        Returns func timed under name
+        """
+        counter = self.counters.setdefault(name, [0, 0.0])
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counter[0] += 1
+                counter[1] += perf_counter() - t0
+
+        return timed
+
+    def instrument(self, obj, methods, prefix=""):
+        """
+        Replaces the given methods of an object (not its class) with timed ones, undone by restore()
+
+        Parameters
+        ----------
+        obj
+            any object, e.g. a FIPS instance or a psychopy stimulus
+        methods : list
+            method names
+        prefix : str
+            prepended to the method names in the counters
+        """
+        for method in methods:
+            original = vars(obj).get(method)
+            self._patched.append((obj, method, original))
+            setattr(obj, method, self.wrap(getattr(obj, method), prefix + method))
+
+    def restore(self):
+        for obj, method, original in reversed(self._patched):
+            if original is None:
+                delattr(obj, method)
+            else:
+                setattr(obj, method, original)
+        self._patched = []
+
+    def summary(self):
+        """
+        Returns
+        -------
+        pd.DataFrame
+            calls, total and mean time (ms) per counter, sorted by total time
+        """
+        df = pd.DataFrame(
+            [(name, calls, total * 1000) for name, (calls, total) in self.counters.items()],
+            columns=["name", "calls", "total_ms"]
+        )
+        df["mean_ms"] = df["total_ms"] / df["calls"].where(df["calls"] > 0)
+        return df.sort_values("total_ms", ascending=False).reset_index(drop=True)
+
+
+class BlockCapture:
+    """
+    cProfile or pyinstrument capture of one block
+    """
+
+    def __init__(self, mode="cprofile"):
+        if mode not in ["cprofile", "pyinstrument"]:
+            raise ValueError(f"Profile capture mode {mode} is not valid.")
+        self.mode = mode
+
+        if self.mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise ImportError("pyinstrument capture needs pyinstrument installed (pip install pyinstrument).")
+            self._profiler = Profiler()
+        else:
+            self._profiler = cProfile.Profile()
+        self._started = False
+        self._running = False
+
+    def start(self):
+        self._started = True
+        self._running = True
+        if self.mode == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        """
+        Stops the capture, does nothing if it is not running
+        """
+        if not self._running:
+            return
+        self._running = False
+
+        if self.mode == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def save(self, file_name):
+        """
+        Writes the capture, .prof stats for cProfile and an html report for pyinstrument
+        """
+        if not self._started:
+            raise RuntimeError("The profile capture was never started.")
+
+        file_name = str(file_name)
+        if self.mode == "pyinstrument":
+            with open(file_name, "w") as f:
+                f.write(self._profiler.output_html())
+        else:
+            pstats.Stats(self._profiler).dump_stats(file_name)
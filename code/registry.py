@@ -0,0 +1,303 @@
+#!usr/bin/env python
+"""
+Created at 10/19/26
+@author: devxl
+
+Index of the participants, sessions and run files under data/
+"""
+from pathlib import Path
+import argparse
+import hashlib
+import sqlite3
+import csv
+import re
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# columns of participants.tsv after participant_id
+PARTICIPANT_COLS = ["netid", "initials", "age", "sex", "handedness", "vision", "date"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS participants (
+    sub_id TEXT PRIMARY KEY,
+    netid TEXT,
+    initials TEXT,
+    age INTEGER,
+    sex TEXT,
+    handedness TEXT,
+    vision TEXT,
+    date TEXT
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    sub_id TEXT NOT NULL REFERENCES participants(sub_id),
+    ses TEXT NOT NULL,
+    task TEXT NOT NULL,
+    date TEXT,
+    PRIMARY KEY (sub_id, ses, task)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sub_id TEXT NOT NULL,
+    ses TEXT NOT NULL,
+    task TEXT NOT NULL,
+    run INTEGER NOT NULL DEFAULT 1,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    sha256 TEXT,
+    FOREIGN KEY (sub_id, ses, task) REFERENCES sessions(sub_id, ses, task)
+);
+CREATE TABLE IF NOT EXISTS run_attrs (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (run_id, name, value)
+);
+CREATE INDEX IF NOT EXISTS runs_ses_task ON runs (ses, task, kind);
+CREATE INDEX IF NOT EXISTS runs_sub ON runs (sub_id);
+CREATE INDEX IF NOT EXISTS run_attrs_value ON run_attrs (name, value);
+"""
+
+# sub-01_ses-1_task-saccade[_run-1][_latency].csv
+FILE_PATTERN = re.compile(
+    r"sub-(?P<sub_id>[^_]+)_ses-(?P<ses>[^_]+)_task-(?P<task>[^_.]+)(?:_run-(?P<run>\d+))?(?:_(?P<suffix>[^.]+))?"
+    r"\.(?P<ext>\w+)$"
+)
+
+
+# run CSV columns that runs are indexed by
+INDEX_COLS = ["velocity"]
+
+
+def index_value(value):
+    """
+    Normalizes an index value so that 2, 2.0 and "2" match
+    """
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def csv_values(path, columns=INDEX_COLS):
+    """
+    Distinct non-empty values of the given columns of a run CSV
+
+    Returns
+    -------
+    dict
+        column -> sorted list of values, columns missing from the file are left out
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = [col for col in columns if col in (reader.fieldnames or [])]
+        values = {col: set() for col in columns}
+        for row in reader:
+            for col in columns:
+                if row[col] not in (None, ""):
+                    values[col].add(index_value(row[col]))
+
+    return {col: sorted(vals) for col, vals in values.items()}
+
+
+def file_hash(path):
+    """
+    sha256 of a file, read in chunks
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class Registry:
+    """
+    SQLite registry of participants, sessions and run files, every write is a single transaction
+    """
+
+    def __init__(self, data_dir=DATA_DIR, db_file="registry.sqlite"):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.data_dir / db_file))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sub_dir(self, sub_id, task):
+        """
+        Makes (if needed) and returns data/sub-XX/<task>
+        """
+        path = self.data_dir / f"sub-{sub_id}" / task
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _relative(self, path):
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.data_dir.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _add_participant(self, sub_id, info):
+        info = {col: info[col] for col in PARTICIPANT_COLS if info.get(col) is not None}
+        self.conn.execute("INSERT OR IGNORE INTO participants (sub_id) VALUES (?)", (sub_id,))
+        if info:
+            assignments = ", ".join(f"{col} = ?" for col in info)
+            self.conn.execute(
+                f"UPDATE participants SET {assignments} WHERE sub_id = ?", (*info.values(), sub_id)
+            )
+
+    def add_participant(self, sub_id, **info):
+        """
+        Adds a participant or updates the demographics that are given, the rest are left as they are
+        """
+        with self.conn:
+            self._add_participant(sub_id, info)
+
+    def add_session(self, sub_id, ses, task, date=None, **info):
+        """
+        Registers a session launch, along with the participant's demographics if given
+        """
+        if info:
+            info.setdefault("date", date)
+        with self.conn:
+            self._add_participant(sub_id, info)
+            self.conn.execute(
+                "INSERT INTO sessions (sub_id, ses, task, date) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (sub_id, ses, task) DO UPDATE SET date = COALESCE(excluded.date, date)",
+                (sub_id, str(ses), task, date)
+            )
+
+    def add_runs(self, sub_id, ses, task, files, run=1, **attrs):
+        """
+        Registers the files of a run with their content hashes
+
+        Parameters
+        ----------
+        sub_id : str
+        ses : str
+        task : str
+        files : dict
+            kind of file (e.g. "data", "log", "latency") -> path, missing files are skipped
+        run : int
+        attrs
+            values to index the run by, list values are indexed element-wise (e.g. velocity=[1, 1.5, 2])
+        """
+        with self.conn:
+            self._add_participant(sub_id, {})
+            self.conn.execute(
+                "INSERT OR IGNORE INTO sessions (sub_id, ses, task) VALUES (?, ?, ?)", (sub_id, str(ses), task)
+            )
+            for kind, path in files.items():
+                if path is None or not Path(path).is_file():
+                    continue
+                rel_path = self._relative(path)
+                self.conn.execute("DELETE FROM runs WHERE path = ?", (rel_path,))
+                run_id = self.conn.execute(
+                    "INSERT INTO runs (sub_id, ses, task, run, kind, path, sha256) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (sub_id, str(ses), task, run, kind, rel_path, file_hash(path))
+                ).lastrowid
+                for name, values in attrs.items():
+                    values = values if isinstance(values, (list, tuple, set)) else [values]
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO run_attrs (run_id, name, value) VALUES (?, ?, ?)",
+                        [(run_id, name, index_value(value)) for value in values]
+                    )
+
+    def find_runs(self, sub_id=None, ses=None, task=None, kind="data", **attrs):
+        """
+        Looks up runs, e.g. find_runs(ses=2, task="saccade", velocity=2)
+
+        Returns
+        -------
+        list
+            sqlite3.Row objects with the run's columns and its absolute path under `abs_path`
+        """
+        query = "SELECT runs.* FROM runs"
+        where = []
+        args = []
+        for i, (name, value) in enumerate(attrs.items()):
+            query += f" JOIN run_attrs a{i} ON a{i}.run_id = runs.run_id AND a{i}.name = ? AND a{i}.value = ?"
+            args += [name, index_value(value)]
+        for col, value in [("sub_id", sub_id), ("ses", ses), ("task", task), ("kind", kind)]:
+            if value is not None:
+                where.append(f"runs.{col} = ?")
+                args.append(str(value))
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY runs.sub_id, runs.ses, runs.run"
+
+        return [
+            {**dict(row), "abs_path": self.data_dir / row["path"]}
+            for row in self.conn.execute(query, args)
+        ]
+
+    def verify(self):
+        """
+        Returns the registered paths whose files are missing or whose content changed
+        """
+        bad = []
+        for row in self.conn.execute("SELECT path, sha256 FROM runs"):
+            path = self.data_dir / row["path"]
+            if not path.is_file() or file_hash(path) != row["sha256"]:
+                bad.append(row["path"])
+        return bad
+
+    def scan(self):
+        """
+        Indexes any run files under data/ that follow the sub-XX_ses-X_task-X naming and are not registered yet
+        """
+        known = {row["path"] for row in self.conn.execute("SELECT path FROM runs")}
+        for path in sorted(self.data_dir.glob("sub-*/*/sub-*")):
+            match = FILE_PATTERN.match(path.name)
+            if match is None or self._relative(path) in known:
+                continue
+            kind = match["suffix"] or ("data" if match["ext"] == "csv" else match["ext"])
+            attrs = csv_values(path) if kind == "data" else {}
+            self.add_runs(
+                match["sub_id"], match["ses"], match["task"], {kind: path}, run=int(match["run"] or 1), **attrs
+            )
+
+    def export_participants(self, file_name=None):
+        """
+        Writes participants.tsv in BIDS form (participant_id first, n/a for missing values)
+        """
+        file_name = file_name or self.data_dir / "participants.tsv"
+        rows = self.conn.execute(f"SELECT sub_id, {', '.join(PARTICIPANT_COLS)} FROM participants ORDER BY sub_id")
+
+        with open(file_name, "w", newline="") as f:
+            writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+            writer.writerow(["participant_id"] + PARTICIPANT_COLS)
+            for row in rows:
+                writer.writerow(
+                    [f"sub-{row['sub_id']}"] + ["n/a" if row[col] in (None, "") else row[col] for col in PARTICIPANT_COLS]
+                )
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Maintain the data/ registry")
+    parser.add_argument("command", choices=["scan", "verify", "export"])
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    args = parser.parse_args()
+
+    with Registry(args.data_dir) as registry:
+        if args.command == "scan":
+            registry.scan()
+        elif args.command == "verify":
+            for path in registry.verify():
+                print(f"changed or missing: {path}")
+        else:
+            registry.export_participants()
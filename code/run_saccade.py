@@ -10,6 +10,9 @@ from psychopy.tools.monitorunittools import deg2pix
 from psychopy.iohub.client import yload, yLoader
 from psychopy.iohub import launchHubServer
 from fips import FIPS
+from latency import GazeLatencyLog
+from registry import Registry, csv_values
+from profiling import StimProfiler, BlockCapture
 from utils import *
 from pathlib import Path
 import pandas as pd
@@ -26,323 +29,503 @@ NAME = "FIPSSaccade"
 SESSIONS = 2
 TASK = "saccade"
 PATH = Path('.').resolve() 
-sub_id = int(sys.argv[1])
-ses = sys.argv[2]
-if ses not in ["1", "2"]:
-    raise ValueError("Session is not valid.")
-
-# directories
-config_dir = PATH / "config"
-data_dir = PATH.parent / "data" 
-sub_id = f"{sub_id:02d}"
-sub_dir = data_dir / f"sub-{sub_id}"
-ses_dir = sub_dir / f"{TASK}"
-
-if not sub_dir.is_dir():
-    sub_dir.mkdir()
-if not ses_dir.is_dir():
-    ses_dir.mkdir()
-
-# files
-log_file = str(ses_dir / f"sub-{sub_id}_ses-{ses}_task-{TASK}.log")
-run_file = str(ses_dir / f"sub-{sub_id}_ses-{ses}_task-{TASK}.csv")
-
-# Info
-sub_dlg = gui.Dlg(title="Participant Information", labelButtonOK="Register", labelButtonCancel="Quit")
-
-# experiment
-sub_dlg.addText(text="Experiment", color="blue")
-sub_dlg.addFixedField("Title:", NAME)
-sub_dlg.addFixedField("Date:", str(data.getDateStr()))
-sub_dlg.addFixedField("Session:", ses)
-sub_dlg.addFixedField("Task:", TASK)
-
-# subject
-sub_dlg.addText(text="Participant info", color="blue")
-sub_dlg.addFixedField("ID:", sub_id)
-sub_dlg.addField("NetID:", tip="Leave blank if you do not have one")
-sub_dlg.addField("Initials:", tip="Lowercase letters separated by dots (e.g. g.o.d)")
-sub_dlg.addField("Age:", choices=list(range(18, 81)))
-sub_dlg.addField("Gender:", choices=["Male", "Female"])
-sub_dlg.addField("Handedness:", choices=["Right", "Left"])
-sub_dlg.addField("Vision:", choices=["Normal", "Corrected", "Other"])
-
-sub_params = {}
-if ses == "1":
-    sub_info = sub_dlg.show()
-    if sub_dlg.OK:
-        sub_params["date"] = sub_info[1]
-        sub_params["netid"] = sub_info[5]
-        sub_params["initials"] = sub_info[6]
-        sub_params["age"] = int(sub_info[7])
-        sub_params["sex"] = sub_info[8]
-        sub_params["handedness"] = sub_info[9]
-        sub_params["vision"] = sub_info[10]
-    else:
-        core.quit()
-
-# Display
-disp = make_test_monitor()
-
-# Window
-win = visual.Window(
-    size=[1024, 768],
-    fullscr=False,
-    allowGUI=False,
-    monitor=disp,
-    screen=1,
-    units='pix',
-    gamma=None,
-    name='SaccadeWindow'
-)
-
-# Logging
-global_clock = core.Clock()
-logging.setDefaultClock(global_clock)
-logging.console.setLevel(logging.DEBUG)
-run_log = logging.LogFile(log_file, level=logging.DEBUG, filemode='w')
-logging.info(f"Date: {data.getDateStr()}")
-logging.info(f"Subject: {sub_id}")
-logging.info(f"Task: {TASK}")
-logging.info(f"Session: {ses}")
-logging.info("==========================================")
-
-# Eye-tracker
-# try:
-#     tracker_config = yload(open(str(config_dir / 'tracker_config.yaml'), 'r'), Loader=yLoader)
-#     hub = launchHubServer(**tracker_config)
-#     tracker = hub.getDevice('tracker')
-#     print(tracker)
-# except Exception as e:
-#     logging.error(f"Could not initiate eye tracking: {e}")
-TRACKER = 'eyelink'
-eyetracker_config = dict(name='tracker')
-tracker_config = None
-eyetracker_config['model_name'] = 'EYELINK 1000 DESKTOP'
-eyetracker_config['simulation_mode'] = False
-eyetracker_config['runtime_settings'] = dict(sampling_rate=1000, track_eyes='RIGHT')
-tracker_config = {'eyetracker.hw.sr_research.eyelink.EyeTracker':eyetracker_config}
-hub = launchHubServer(**tracker_config)
-tracker = hub.getDevice('tracker')
-
-# ============================================================
-#                          Stimulus
-# ============================================================
-stim_size = deg2pix(degrees=10, monitor=disp)
-stim = FIPS(win=win, size=stim_size, pos=[0, 3], name='ExperimentFrame')
-
-crit_region_size = deg2pix(degrees=2, monitor=disp)
-crit_region = visual.Circle(win=win, lineColor=[0, 0, 0], radius=crit_region_size, autoLog=False)
-
-# messages
-begin_msg = visual.TextStim(win=win, text="Press any key to start.", autoLog=False)
-between_block_txt = "You just finished block {}. Number of remaining of blocks: {}.\nPress the spacebar to continue."
-between_block_msg = visual.TextStim(win=win, autoLog=False)
-fixation_msg = visual.TextStim(win=win, text="Fixate on the dot.", pos=[0, -200], autoLog=False)
-finish_msg = visual.TextStim(win=win, text="Thank you for participating!", autoLog=False)
-
-# ============================================================
-#                          Procedure
-# ============================================================
-# timing
-trial_clock = core.Clock()
-motion_cycle = 1500  # in ms for a cycle of frame motion
-saccade_times = np.linspace(start=0, stop=1500, num=6)
-
-# experiment
-# n_blocks = 12
-n_blocks = 1
-# total_trials = 384
-total_trials = 10
-block_clock = core.Clock()
-
-runtime_info = info.RunTimeInfo(
-    win=win,
-    refreshTest="grating",
-    verbose=True,
-    userProcsDetailed=True,
-)
-exp_handler = data.ExperimentHandler(
-    name="SaccadeExperiment",
-    version=0.1,
-    extraInfo=sub_params,
-    runtimeInfo=runtime_info,
-    savePickle=False,
-    saveWideText=True,
-    dataFileName=str(run_file)
-)
-
-# Blocks
-conditions = []
-velocities = [1, 1.5, 2]
-for target in ["top", "bot"]:
-    for velocity in velocities:
-        conditions.append(
-            {
-                "target": target,
-                "velocity": velocity,
-                "delay": np.round(np.random.uniform(400, 600)),
-                "t_cue": np.random.choice(saccade_times)
-            }
-        )
-block_handlers = []
-
-for block in range(n_blocks):
-    this_block = data.TrialHandler(
-        name=f"Block_{block}",
-        trialList=conditions,
-        nReps=total_trials/n_blocks,
-        method="fullRandom",
-        # seed=block,
-        originPath=-1
-        )
-    block_handlers.append(this_block)
-    exp_handler.addLoop(this_block)
-
-# ============================================================
-#                          Run
-# ============================================================
-# Runtime parameters
-n_stabilize = 4  # number of transitions needed to stabilize the effect
-path_length = deg2pix(degrees=8, monitor=disp)  # the length of the path that frame moves
-display_rf = 60
-flash_dur = 250
-v_frame = path_length / (motion_cycle - 2*flash_dur)
-saccade_dur = 600
-
-# draw beginning message
-begin_msg.draw()
-begin_time = win.flip()
-hub.sendMessageEvent(text="EXPERIMENT_START", sec_time=begin_time)
-event.waitKeys(keyList=["space"])
-win.mouseVisible = False
-
-# loop blocks
-for idx, block in enumerate(block_handlers):
-
-    # calibrate the eye tracker
-    tracker.runSetupProcedure()
-
-    # initiate eye tracker
-    tracker.setRecordingState(True)
-
-    # block setup
-    if idx > 0:
-        between_block_msg.draw()
-        event.waitKeys(keyList=["space"])
-    
-    hub.clearEvents()
-    win.recordFrameIntervals = True
-    block_clock.reset()
-
-    # loop trials
-    for trial in block:
-
-        # quit the trial if this is set to True anywhere
-        bad_trials = []
-
-        trial_durs = np.asarray([
-            trial["delay"],  # fixation period
-            2 * n_stabilize * motion_cycle,  # stabilization period
-            trial["t_cue"],  # cue period
-            saccade_dur  # Saccade period
-        ])
-
-        trial_frames = trial_durs * display_rf / 1000
-        print(f"trial frames: {trial_frames}")
-
-        n_total_frames = trial_frames.sum()
-
-        fixation_frames = [i for i in range(int(trial_frames[0]))]
-
-        stab_frames = [i for i in range(int(fixation_frames[-1])+1, int(trial_frames[1]))]
-        stab_seq = make_motion_seq(
-            path_dur=int(path_length * (1/v_frame) * display_rf / 1000),
-            flash_dur=int(flash_dur * display_rf / 1000),
-            n_repeat=n_stabilize + 1,  # +1 because of the cue period
-            total_cycle=motion_cycle * display_rf / 1000
-        )
-
-        cue_frames = [i for i in range(int(stab_frames[-1]+1), int(trial_frames[2]+stab_frames[-1]+1))]
-
-        # print((stab_frames[-1]+1), (int(trial_frames[2]+stab_frames[-1]+1)))
-        saccade_frames = [i for i in range(int(cue_frames[-1])+1, int(trial_frames[3]+cue_frames[-1])+1)]
-        saccade_seq = make_motion_seq(
-            path_dur=int(path_length * (1 / v_frame) * display_rf / 1000),
-            flash_dur=int(flash_dur * display_rf / 1000),
-            n_repeat=1,
-            total_cycle=motion_cycle * display_rf / 1000
+VELOCITIES = [1, 1.5, 2]
+
+# session defaults, override any of these in the params passed to run_session
+DEFAULT_PARAMS = {
+    "sub_id": "00",
+    "ses": "1",
+    "sub_params": {},
+    "run_file": None,
+    "latency_file": None,  # per-trial sample-to-photon latencies, None to use the run file's name
+    "measure_latency": False,  # tag the gaze-contingent display changes with their tracker sample times
+    "n_blocks": 1,  # 12 in the full protocol
+    "total_trials": 10,  # 384 in the full protocol
+    "motion_cycle": 1500,  # in ms for a cycle of frame motion
+    "n_stabilize": 4,  # number of transitions needed to stabilize the effect
+    "display_rf": 60,
+    "flash_dur": 250,
+    "saccade_dur": 600,
+    "interactive": True,  # wait for key presses and run the tracker setup between blocks
+    "runtime_info": True,  # run psychopy's refresh test before the session
+    "prebuild": True,  # construct the stimuli before the first block instead of on first use
+    "profile": False,  # call counts and cumulative time of the stimulus methods, gaze checks and flips
+    "profile_capture": None,  # "cprofile" or "pyinstrument" to capture one whole block
+    "profile_block": 0,  # block to capture
+    "profile_file": None,  # capture output, None to use the run file's name
+}
+
+
+def run_session(params, tracker, window, hub=None):
+    """
+    Runs one session of the saccade task
+
+    Parameters
+    ----------
+    params : dict
+        session parameters, missing keys are filled from DEFAULT_PARAMS
+    tracker
+        ioHub eye tracker device or anything with the same interface (e.g. testing.mock_tracker.MockTracker)
+    window : visual.Window
+        window to draw on, its monitor is used for the degree to pixel conversions
+    hub : optional
+        ioHub connection used for sending messages and clearing events
+
+    Returns
+    -------
+    dict
+        number of trials in the protocol and actually run, number of frames, session duration, the frame intervals of the session, the GazeLatencyLog when
+        measuring latency and the StimProfiler when profiling
+    """
+    params = {**DEFAULT_PARAMS, **params}
+    win = window
+    disp = win.monitor
+    logging.info(f"Running session {params['ses']} of subject {params['sub_id']}")
+
+    latency_log = None
+    if params["measure_latency"]:
+        latency_log = GazeLatencyLog()
+
+    profiler = StimProfiler() if params["profile"] else None
+
+    if params["total_trials"] < params["n_blocks"]:
+        raise ValueError(f"{params['total_trials']} trials cannot fill {params['n_blocks']} blocks.")
+
+    if params["profile_capture"] is not None:
+        if not 0 <= params["profile_block"] < params["n_blocks"]:
+            raise ValueError(f"Profile block {params['profile_block']} is not one of the {params['n_blocks']} blocks.")
+        if params["profile_file"] is None and params["run_file"] is None:
+            raise ValueError("Profile capture needs a profile_file or a run_file to save to.")
+
+    # ============================================================
+    #                          Stimulus
+    # ============================================================
+    stim_size = deg2pix(degrees=10, monitor=disp)
+    stim = FIPS(win=win, size=stim_size, pos=[0, 3], name='ExperimentFrame', profiler=profiler)
+    if params["prebuild"]:
+        stim.prebuild()
+
+    crit_region_size = deg2pix(degrees=2, monitor=disp)
+    crit_region = visual.Circle(win=win, lineColor=[0, 0, 0], radius=crit_region_size, autoLog=False)
+
+    # messages
+    begin_msg = visual.TextStim(win=win, text="Press any key to start.", autoLog=False)
+    between_block_txt = "You just finished block {}. Number of remaining of blocks: {}.\nPress the spacebar to continue."
+    between_block_msg = visual.TextStim(win=win, autoLog=False)
+    fixation_msg = visual.TextStim(win=win, text="Fixate on the dot.", pos=[0, -200], autoLog=False)
+    finish_msg = visual.TextStim(win=win, text="Thank you for participating!", autoLog=False)
+
+    # ============================================================
+    #                          Procedure
+    # ============================================================
+    # timing
+    trial_clock = core.Clock()
+    motion_cycle = params["motion_cycle"]
+    saccade_times = np.linspace(start=0, stop=motion_cycle, num=6)
+
+    # experiment
+    n_blocks = params["n_blocks"]
+    total_trials = params["total_trials"]
+    block_clock = core.Clock()
+
+    runtime_info = None
+    if params["runtime_info"]:
+        runtime_info = info.RunTimeInfo(
+            win=win,
+            refreshTest="grating",
+            verbose=True,
+            userProcsDetailed=True,
         )
-
-        # detect fixation
-        fixate = False
-        stim.fixation.autoDraw = True
-        
-        win.flip()
-
-        while not fixate:
-            fixate, msg = detect_fixation(tracker, stim.fixation)
-            fixation_msg.text = msg
-            fixation_msg.draw()
-            win.flip()
-
-        fixation_msg.text = ""
-        fixation_msg.draw()
-        stim.fixation.autoDraw = False
-        win.flip()
-
-        for fr in range(int(n_total_frames)):
-
-            # get eye position
-            gaze_pos = tracker.getLastGazePosition()
-
-            # check if it's valid
-            valid_gaze_pos = isinstance(gaze_pos, (tuple, list))
-
-            if valid_gaze_pos:
-
-                fix_ok = False
-
-                # 1) FIXATION PERIOD
-                if fr in fixation_frames:
-                    stim.fixation.draw()
-
-                    if stim.fixation.contains(gaze_pos):
-                        fix_ok = True
-                    else:
-                        bad_trials.append(trial)
-                        try:
-                            block.next()
-                        except StopIteration:
-                            print("End of Block")
-
-                # 2) STABILIZATION AND CUE PERIOD
-                elif fr in (stab_frames + cue_frames):
-
-                    stim.move_frame(fr, stab_seq)
-
-                    stim.fixation.draw()
-                    if stim.fixation.contains(gaze_pos):
-                        fix_ok = True
-                    else:
-                        bad_trials.append(trial)
-                        try:
-                            block.next()
-                        except StopIteration:
-                            print("End of Block")
-
-                # 3) SACCADE PERIOD
-                elif fr in saccade_frames:
-                    if crit_region.contains(gaze_pos):
-                        stim.move_frame(fr, saccade_seq)
-
+    exp_handler = data.ExperimentHandler(
+        name="SaccadeExperiment",
+        version=0.1,
+        extraInfo={"participant": params["sub_id"], "session": params["ses"], **params["sub_params"]},
+        runtimeInfo=runtime_info,
+        savePickle=False,
+        saveWideText=params["run_file"] is not None,
+        dataFileName=str(params["run_file"] or "")
+    )
+
+    # Blocks
+    conditions = []
+    for target in ["top", "bot"]:
+        for velocity in VELOCITIES:
+            conditions.append(
+                {
+                    "target": target,
+                    "velocity": velocity,
+                    "delay": np.round(np.random.uniform(400, 600)),
+                    "t_cue": np.random.choice(saccade_times)
+                }
+            )
+    block_handlers = []
+
+    # total_trials is the session length, split as evenly as possible over the blocks
+    block_sizes = [total_trials // n_blocks + (block < total_trials % n_blocks) for block in range(n_blocks)]
+    for block in range(n_blocks):
+        this_block = data.TrialHandler(
+            name=f"Block_{block}",
+            trialList=make_block_trials(conditions, block_sizes[block], block),
+            nReps=1,
+            method="random",
+            # seed=block,
+            originPath=-1
+            )
+        block_handlers.append(this_block)
+        exp_handler.addLoop(this_block)
+
+    # ============================================================
+    #                          Run
+    # ============================================================
+    # Runtime parameters
+    n_stabilize = params["n_stabilize"]
+    path_length = deg2pix(degrees=8, monitor=disp)  # the length of the path that frame moves
+    display_rf = params["display_rf"]
+    flash_dur = params["flash_dur"]
+    v_frame = path_length / (motion_cycle - 2*flash_dur)
+    saccade_dur = params["saccade_dur"]
+
+    n_trials = 0
+    n_frames = 0
+
+    # profiling, nothing is patched when it is off. FIPS patches its stimuli itself once they are built, so
+    # reading them here would build them early. The window and tracker outlive the session, so they are restored
+    # however the session ends
+    check_fixation = detect_fixation
+    if profiler is not None:
+        profiler.instrument(win, ["flip"], prefix="win.")
+        profiler.instrument(stim, ["move_frame", "stabilize_period", "flash_probes"])
+        profiler.instrument(crit_region, ["contains"], prefix="crit_region.")
+        profiler.instrument(tracker, ["getLastSample"], prefix="tracker.")
+        check_fixation = profiler.wrap(detect_fixation, "detect_fixation")
+
+    capture = None
+    if params["profile_capture"] is not None:
+        capture = BlockCapture(params["profile_capture"])
+
+    try:
+        # draw beginning message
+        begin_msg.draw()
+        begin_time = win.flip()
+        if hub is not None:
+            hub.sendMessageEvent(text="EXPERIMENT_START", sec_time=begin_time)
+        if params["interactive"]:
+            event.waitKeys(keyList=["space"])
+        win.mouseVisible = False
+        session_clock = core.Clock()
+
+        # loop blocks
+        for idx, block in enumerate(block_handlers):
+
+            # calibrate the eye tracker
+            if params["interactive"]:
+                tracker.runSetupProcedure()
+
+            # initiate eye tracker
+            tracker.setRecordingState(True)
+
+            # block setup
+            if idx > 0 and params["interactive"]:
+                between_block_msg.text = between_block_txt.format(idx, n_blocks - idx)
+                between_block_msg.draw()
+                win.flip()
+                event.waitKeys(keyList=["space"])
+
+            if hub is not None:
+                hub.clearEvents()
+            win.recordFrameIntervals = True
+            block_clock.reset()
+
+            if capture is not None and idx == params["profile_block"]:
+                capture.start()
+
+            # loop trials
+            for trial in block:
+
+                # quit the trial if this is set to True anywhere
+                bad_trials = []
+
+                trial_durs = np.asarray([
+                    trial["delay"],  # fixation period
+                    2 * n_stabilize * motion_cycle,  # stabilization period
+                    trial["t_cue"],  # cue period
+                    saccade_dur  # Saccade period
+                ])
+
+                trial_frames = trial_durs * display_rf / 1000
+                logging.debug(f"trial frames: {trial_frames}")
+
+                n_total_frames = trial_frames.sum()
+
+                fixation_frames = [i for i in range(int(trial_frames[0]))]
+
+                stab_frames = [i for i in range(int(fixation_frames[-1])+1, int(trial_frames[1]))]
+                stab_seq = make_motion_seq(
+                    path_dur=int(path_length * (1/v_frame) * display_rf / 1000),
+                    flash_dur=int(flash_dur * display_rf / 1000),
+                    n_repeat=n_stabilize + 1,  # +1 because of the cue period
+                    total_cycle=motion_cycle * display_rf / 1000
+                )
+
+                cue_frames = [i for i in range(int(stab_frames[-1]+1), int(trial_frames[2]+stab_frames[-1]+1))]
+
+                # print((stab_frames[-1]+1), (int(trial_frames[2]+stab_frames[-1]+1)))
+                saccade_frames = [i for i in range(int(cue_frames[-1])+1, int(trial_frames[3]+cue_frames[-1])+1)]
+                saccade_seq = make_motion_seq(
+                    path_dur=int(path_length * (1 / v_frame) * display_rf / 1000),
+                    flash_dur=int(flash_dur * display_rf / 1000),
+                    n_repeat=1,
+                    total_cycle=motion_cycle * display_rf / 1000
+                )
+
+                # detect fixation
+                fixate = False
+                stim.fixation.autoDraw = True
+                
+                win.flip()
+
+                while not fixate:
+                    fixate, msg = check_fixation(tracker, stim.fixation)
+                    fixation_msg.text = msg
+                    fixation_msg.draw()
+                    win.flip()
+
+                fixation_msg.text = ""
+                fixation_msg.draw()
+                stim.fixation.autoDraw = False
+                win.flip()
+
+                tracker.sendMessage(f"TRIAL_START {n_trials}")
+                if latency_log is not None:
+                    latency_log.start_trial(trial=n_trials, block=idx, velocity=trial["velocity"], t_cue=trial["t_cue"])
+
+                for fr in range(int(n_total_frames)):
+
+                    # get eye position, the gaze and the latency tag come from the same sample
+                    sample = read_sample(tracker.getLastSample())
+                    gaze_pos = sample_gaze(sample)
+
+                    # check if it's valid
+                    valid_gaze_pos = isinstance(gaze_pos, (tuple, list))
+
+                    if valid_gaze_pos:
+
+                        fix_ok = False
+
+                        # 1) FIXATION PERIOD
+                        if fr in fixation_frames:
+                            stim.fixation.draw()
+
+                            if stim.fixation.contains(gaze_pos):
+                                fix_ok = True
+                            else:
+                                bad_trials.append(trial)
+                                try:
+                                    block.next()
+                                except StopIteration:
+                                    print("End of Block")
+
+                        # 2) STABILIZATION AND CUE PERIOD
+                        elif fr in (stab_frames + cue_frames):
+
+                            stim.move_frame(fr, stab_seq)
+
+                            stim.fixation.draw()
+                            if stim.fixation.contains(gaze_pos):
+                                fix_ok = True
+                            else:
+                                bad_trials.append(trial)
+                                try:
+                                    block.next()
+                                except StopIteration:
+                                    print("End of Block")
+
+                        # 3) SACCADE PERIOD
+                        elif fr in saccade_frames:
+                            if fr == saccade_frames[0]:
+                                tracker.sendMessage("SACCADE_PERIOD_START")
+
+                            if crit_region.contains(gaze_pos):
+                                stim.move_frame(fr, saccade_seq)
+                            elif latency_log is not None and not latency_log.tagged:
+                                latency_log.tag(sample)
+                                win.callOnFlip(latency_log.flipped)
+
+                    win.flip()
+                    n_frames += 1
+
+                tracker.sendMessage(f"TRIAL_END {n_trials}")
+                if latency_log is not None and latency_log.tagged:
+                    exp_handler.addData("sample_to_photon", latency_log.last_latency)
+
+                n_trials += 1
                 exp_handler.nextEntry()
 
-    tracker.setRecordingState(False)
-    win.recordFrameIntervals = False
-
-tracker.setConnectionState(False)
-exp_handler.saveAsWideText(fileName=str(run_file))
-hub.quit()
-win.close()
-core.quit()
+            if capture is not None and idx == params["profile_block"]:
+                capture.stop()
+
+            tracker.setRecordingState(False)
+            win.recordFrameIntervals = False
+    finally:
+        if capture is not None:
+            capture.stop()
+        if profiler is not None:
+            profiler.restore()
+
+    session_dur = session_clock.getTime()
+
+    if params["run_file"] is not None:
+        exp_handler.saveAsWideText(fileName=str(params["run_file"]))
+
+    latency_file = params["latency_file"]
+    if latency_file is None and params["run_file"] is not None:
+        latency_file = str(params["run_file"]).replace(".csv", "_latency.csv")
+    if latency_log is not None and latency_file is not None:
+        latency_log.save(latency_file)
+
+    profile_file = params["profile_file"]
+    if profile_file is None and params["run_file"] is not None:
+        suffix = ".prof" if params["profile_capture"] == "cprofile" else "_profile.html"
+        profile_file = str(params["run_file"]).replace(".csv", suffix)
+    if capture is not None and profile_file is not None:
+        capture.save(profile_file)
+
+    return {
+        "protocol_trials": total_trials,
+        "n_trials": n_trials,
+        "n_frames": n_frames,
+        "duration": session_dur,
+        "frame_intervals": list(win.frameIntervals),
+        "latency": latency_log,
+        "profile": profiler,
+    }
+
+
+if __name__ == "__main__":
+
+    sub_id = int(sys.argv[1])
+    ses = sys.argv[2]
+    if ses not in ["1", "2"]:
+        raise ValueError("Session is not valid.")
+
+    # directories
+    config_dir = PATH / "config"
+    data_dir = PATH.parent / "data" 
+    sub_id = f"{sub_id:02d}"
+    registry = Registry(data_dir)
+    ses_dir = registry.sub_dir(sub_id, TASK)
+
+    # files
+    log_file = str(ses_dir / f"sub-{sub_id}_ses-{ses}_task-{TASK}.log")
+    run_file = str(ses_dir / f"sub-{sub_id}_ses-{ses}_task-{TASK}.csv")
+
+    # Info
+    sub_dlg = gui.Dlg(title="Participant Information", labelButtonOK="Register", labelButtonCancel="Quit")
+
+    # experiment
+    sub_dlg.addText(text="Experiment", color="blue")
+    sub_dlg.addFixedField("Title:", NAME)
+    sub_dlg.addFixedField("Date:", str(data.getDateStr()))
+    sub_dlg.addFixedField("Session:", ses)
+    sub_dlg.addFixedField("Task:", TASK)
+
+    # subject
+    sub_dlg.addText(text="Participant info", color="blue")
+    sub_dlg.addFixedField("ID:", sub_id)
+    sub_dlg.addField("NetID:", tip="Leave blank if you do not have one")
+    sub_dlg.addField("Initials:", tip="Lowercase letters separated by dots (e.g. g.o.d)")
+    sub_dlg.addField("Age:", choices=list(range(18, 81)))
+    sub_dlg.addField("Gender:", choices=["Male", "Female"])
+    sub_dlg.addField("Handedness:", choices=["Right", "Left"])
+    sub_dlg.addField("Vision:", choices=["Normal", "Corrected", "Other"])
+
+    sub_params = {}
+    if ses == "1":
+        sub_info = sub_dlg.show()
+        if sub_dlg.OK:
+            sub_params["date"] = sub_info[1]
+            sub_params["netid"] = sub_info[5]
+            sub_params["initials"] = sub_info[6]
+            sub_params["age"] = int(sub_info[7])
+            sub_params["sex"] = sub_info[8]
+            sub_params["handedness"] = sub_info[9]
+            sub_params["vision"] = sub_info[10]
+        else:
+            core.quit()
+
+    registry.add_session(sub_id, ses, TASK, **{"date": data.getDateStr(), **sub_params})
+    registry.export_participants()
+
+    # Display
+    disp = make_test_monitor()
+
+    # Window
+    win = visual.Window(
+        size=[1024, 768],
+        fullscr=False,
+        allowGUI=False,
+        monitor=disp,
+        screen=1,
+        units='pix',
+        gamma=None,
+        name='SaccadeWindow'
+    )
+
+    # Logging
+    global_clock = core.Clock()
+    logging.setDefaultClock(global_clock)
+    logging.console.setLevel(logging.DEBUG)
+    run_log = logging.LogFile(log_file, level=logging.DEBUG, filemode='w')
+    logging.info(f"Date: {data.getDateStr()}")
+    logging.info(f"Subject: {sub_id}")
+    logging.info(f"Task: {TASK}")
+    logging.info(f"Session: {ses}")
+    logging.info("==========================================")
+
+    # Eye-tracker
+    # try:
+    #     tracker_config = yload(open(str(config_dir / 'tracker_config.yaml'), 'r'), Loader=yLoader)
+    #     hub = launchHubServer(**tracker_config)
+    #     tracker = hub.getDevice('tracker')
+    #     print(tracker)
+    # except Exception as e:
+    #     logging.error(f"Could not initiate eye tracking: {e}")
+    TRACKER = 'eyelink'
+    eyetracker_config = dict(name='tracker')
+    tracker_config = None
+    eyetracker_config['model_name'] = 'EYELINK 1000 DESKTOP'
+    eyetracker_config['simulation_mode'] = False
+    eyetracker_config['runtime_settings'] = dict(sampling_rate=1000, track_eyes='RIGHT')
+    tracker_config = {'eyetracker.hw.sr_research.eyelink.EyeTracker':eyetracker_config}
+    hub = launchHubServer(**tracker_config)
+    tracker = hub.getDevice('tracker')
+
+    # ============================================================
+    #                          Run
+    # ============================================================
+    session_params = {
+        "sub_id": sub_id,
+        "ses": ses,
+        "sub_params": sub_params,
+        "run_file": run_file,
+        "measure_latency": True,
+    }
+    run_session(session_params, tracker, win, hub=hub)
+
+    tracker.setConnectionState(False)
+    hub.quit()
+    win.close()
+
+    # close the log before hashing it so later messages do not change the registered file
+    logging.flush()
+    logging.root.removeTarget(run_log)
+    run_log.stream.close()
+
+    registry.add_runs(
+        sub_id, ses, TASK,
+        {"data": run_file, "log": log_file, "latency": run_file.replace(".csv", "_latency.csv")},
+        **csv_values(run_file)
+    )
+    registry.close()
+
+    core.quit()
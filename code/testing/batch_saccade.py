@@ -0,0 +1,132 @@
+#!usr/bin/env python
+"""
+Created at 10/19/26
+@author: devxl
+
+Load test for the saccade task: runs simulated participants through the full protocol in parallel processes
+using the mock tracker and a headless window, then reports throughput and timing fidelity.
+
+    python testing/batch_saccade.py --participants 4 --processes 4
+"""
+from pathlib import Path
+import multiprocessing as mp
+import argparse
+import time
+import sys
+
+import numpy as np
+
+CODE_DIR = Path(__file__).resolve().parent.parent
+
+
+def run_participant(sub_id, n_blocks, total_trials, display_rf, profile=False):
+    """
+    Runs one simulated participant, meant to be called in a worker process
+
+    Parameters
+    ----------
+    sub_id : int
+    n_blocks : int
+    total_trials : int
+    display_rf : int
+    profile : bool
+        collect the per-method counters of run_saccade.run_session
+
+    Returns
+    -------
+    dict
+        session summary from run_saccade.run_session plus the participant id
+    """
+    # pyglet has to be set to headless before psychopy creates any windows
+    import pyglet
+    pyglet.options["headless"] = True
+
+    sys.path.insert(0, str(CODE_DIR))
+    sys.path.insert(0, str(CODE_DIR / "testing"))
+    from psychopy import visual, logging
+    from run_saccade import run_session
+    from mock_tracker import MockTracker
+    from utils import make_test_monitor
+
+    logging.console.setLevel(logging.WARNING)
+
+    win = visual.Window(
+        size=[1024, 768],
+        fullscr=False,
+        allowGUI=False,
+        monitor=make_test_monitor(),
+        units='pix',
+        gamma=None,
+        waitBlanking=False,
+        checkTiming=False,
+        name=f'BatchWindow{sub_id}'
+    )
+    tracker = MockTracker(noise=1.0, frame_rate=display_rf, seed=sub_id)
+
+    params = {
+        "sub_id": f"{sub_id:02d}",
+        "n_blocks": n_blocks,
+        "total_trials": total_trials,
+        "display_rf": display_rf,
+        "interactive": False,
+        "runtime_info": False,
+        "profile": profile,
+    }
+    summary = run_session(params, tracker, win)
+    win.close()
+
+    summary["sub_id"] = sub_id
+    return summary
+
+
+def report(summaries, display_rf, wall_time):
+    """
+    Prints per-participant and overall throughput and frame timing
+    """
+    frame_dur = 1 / display_rf
+    total_trials = 0
+    protocol_trials = 0
+
+    print(f"{'sub':>4} {'protocol':>9} {'trials':>7} {'frames':>8} {'dur (s)':>9} {'trials/s':>9} "
+          f"{'mean ifi (ms)':>14} {'sd ifi (ms)':>12} {'late':>6}")
+    for summary in sorted(summaries, key=lambda s: s["sub_id"]):
+        intervals = np.asarray(summary["frame_intervals"])
+        late = np.sum(intervals > 1.5 * frame_dur) if intervals.size else 0
+        mean_ifi = intervals.mean() * 1000 if intervals.size else np.nan
+        sd_ifi = intervals.std() * 1000 if intervals.size else np.nan
+        print(f"{summary['sub_id']:>4} {summary['protocol_trials']:>9} {summary['n_trials']:>7} {summary['n_frames']:>8} "
+              f"{summary['duration']:>9.1f} {summary['n_trials'] / summary['duration']:>9.2f} "
+              f"{mean_ifi:>14.2f} {sd_ifi:>12.2f} {late:>6}")
+        total_trials += summary["n_trials"]
+        protocol_trials += summary["protocol_trials"]
+
+    print(f"\n{len(summaries)} participants, {total_trials} trials run of {protocol_trials} in the protocol, in {wall_time:.1f} s "
+          f"({total_trials / wall_time:.2f} trials/s overall, target frame duration {frame_dur * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=mp.cpu_count())
+    parser.add_argument("--blocks", type=int, default=12)
+    parser.add_argument("--trials", type=int, default=384)
+    parser.add_argument("--refresh-rate", type=int, default=60)
+    parser.add_argument("--profile", action="store_true", help="print the per-method counters of each participant")
+    args = parser.parse_args()
+
+    jobs = [(sub_id, args.blocks, args.trials, args.refresh_rate, args.profile) for sub_id in range(1, args.participants + 1)]
+
+    # spawn so every worker gets a fresh OpenGL context
+    ctx = mp.get_context("spawn")
+    t0 = time.perf_counter()
+    with ctx.Pool(processes=min(args.processes, args.participants)) as pool:
+        results = pool.starmap(run_participant, jobs)
+    report(results, args.refresh_rate, time.perf_counter() - t0)
+
+    if args.profile:
+        for summary in sorted(results, key=lambda s: s["sub_id"]):
+            print(f"\nsub {summary['sub_id']}")
+            print(summary["profile"].summary().to_string(index=False))
+            for build in summary["profile"].builds:
+                print(f"built {build['name']} in {build['duration_ms']:.2f} ms after {build['frame']} flips")
@@ -0,0 +1,73 @@
+#!usr/bin/env python
+"""
+Created at 10/19/26
+@author: devxl
+
+Benchmark of the gaze-contingent latency: runs the saccade task with the mock tracker making a saccade in every
+saccade period, then writes the per-trial sample-to-photon latencies and prints their distribution.
+
+    python testing/latency_benchmark.py --trials 30 --out latency_benchmark.csv
+"""
+from pathlib import Path
+import argparse
+import sys
+
+CODE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CODE_DIR))
+sys.path.insert(0, str(CODE_DIR / "testing"))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=1)
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--refresh-rate", type=int, default=60)
+    parser.add_argument("--sample-delay", type=float, default=0.002, help="simulated tracker transport delay (s)")
+    parser.add_argument("--headless", action="store_true", help="offscreen window, flips do not wait for vsync")
+    parser.add_argument("--out", default="latency_benchmark.csv")
+    args = parser.parse_args()
+
+    if args.headless:
+        import pyglet
+        pyglet.options["headless"] = True
+
+    from psychopy import visual, logging
+    from run_saccade import run_session
+    from mock_tracker import MockTracker
+    from utils import make_test_monitor
+
+    logging.console.setLevel(logging.WARNING)
+
+    win = visual.Window(
+        size=[1024, 768],
+        fullscr=False,
+        allowGUI=False,
+        monitor=make_test_monitor(),
+        units='pix',
+        gamma=None,
+        waitBlanking=not args.headless,
+        name='LatencyBenchmarkWindow'
+    )
+    # headless flips do not wait for vsync, so the simulated saccade is scheduled in frames
+    tracker = MockTracker(
+        sample_delay=args.sample_delay,
+        frame_rate=args.refresh_rate if args.headless else None,
+        seed=0
+    )
+
+    params = {
+        "n_blocks": args.blocks,
+        "total_trials": args.trials,
+        "display_rf": args.refresh_rate,
+        "interactive": False,
+        "runtime_info": False,
+        "measure_latency": True,
+        "latency_file": args.out,
+    }
+    summary = run_session(params, tracker, win)
+    win.close()
+
+    print(f"{len(summary['latency'].records)} gaze-contingent changes in {summary['n_trials']} trials, "
+          f"written to {args.out}")
+    print(summary["latency"].summary())
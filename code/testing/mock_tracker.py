@@ -3,5 +3,157 @@
 Created at 1/20/21
 @author: devxl
 
-Description
+Mock eye tracker that stands in for the ioHub EyeLink device when running without hardware
 """
+from collections import namedtuple
+from psychopy import core
+import numpy as np
+
+MockSample = namedtuple("MockSample", ["device_time", "time", "gaze_x", "gaze_y"])
+
+
+class MockTracker:
+    """
+    Simulated participant's eye tracker with the subset of the ioHub EyeTracker interface the tasks use
+    """
+
+    def __init__(
+            self,
+            gaze=None,
+            noise=0.0,
+            sampling_rate=1000,
+            sample_delay=0.002,
+            saccade_latency=(0.15, 0.25),
+            saccade_target=(0.0, 300.0),
+            frame_rate=None,
+            seed=None
+    ):
+        """
+        Parameters
+        ----------
+        gaze : callable, optional
+            maps the time since recording started (s) to a gaze position in pix, or None for a lost sample.
+            Defaults to steady fixation on the center of the screen.
+        noise : float
+            standard deviation of the gaussian noise added to each gaze position (pix)
+        sampling_rate : int
+            samples per second
+        sample_delay : float
+            time (s) from a sample being taken to it being available to the experiment
+        saccade_latency : tuple
+            range (s) of the uniformly distributed delay between the SACCADE_PERIOD_START message and the saccade,
+            None to never saccade
+        saccade_target : tuple
+            landing position of the saccade (pix)
+        frame_rate : int, optional
+            schedule the saccade in frames instead of wall-clock time, for loops that do not wait for vsync (e.g.
+            headless windows). The latency is converted to frames at this rate and counted in getLastSample calls,
+            which the saccade task makes once per frame.
+        seed : int, optional
+            seed for the noise and the saccade latencies
+        """
+        self.gaze = gaze if gaze is not None else (lambda t: (0.0, 0.0))
+        self.noise = noise
+        self.sampling_rate = sampling_rate
+        self.sample_delay = sample_delay
+        self.saccade_latency = saccade_latency
+        self.saccade_target = saccade_target
+        self.frame_rate = frame_rate
+        self.rng = np.random.default_rng(seed)
+
+        # the tracker's own clock is in ms and has an arbitrary offset from the experiment clock
+        self.device_offset = self.rng.uniform(0, 1e6)
+        self.messages = []
+
+        self._connected = True
+        self._recording = False
+        self._record_start = None
+        self._saccade_at = None
+        self._saccade_in_frames = None
+
+    def runSetupProcedure(self):
+        return True
+
+    def setConnectionState(self, enable):
+        self._connected = enable
+        return self._connected
+
+    def isConnected(self):
+        return self._connected
+
+    def setRecordingState(self, recording):
+        self._recording = recording
+        self._record_start = core.getTime() if recording else None
+        return self._recording
+
+    def isRecordingEnabled(self):
+        return self._recording
+
+    def trackerSec(self):
+        return core.getTime()
+
+    def sendMessage(self, message_contents, time_offset=None):
+        """
+        Logs a message, SACCADE_PERIOD_START schedules a saccade and TRIAL_END brings the gaze back to fixation
+        """
+        now = core.getTime()
+        self.messages.append((now, message_contents))
+
+        if message_contents == "SACCADE_PERIOD_START" and self.saccade_latency is not None:
+            latency = self.rng.uniform(*self.saccade_latency)
+            if self.frame_rate is None:
+                self._saccade_at = now + latency
+            else:
+                self._saccade_in_frames = int(round(latency * self.frame_rate))
+        elif message_contents.startswith("TRIAL_END"):
+            self._saccade_at = None
+            self._saccade_in_frames = None
+
+        return True
+
+    def getLastSample(self):
+        """
+        Latest sample available to the experiment, None if not recording
+        """
+        if self._saccade_in_frames is not None:
+            if self._saccade_in_frames == 0:
+                self._saccade_at = -np.inf  # the gaze has landed from this sample on
+                self._saccade_in_frames = None
+            else:
+                self._saccade_in_frames -= 1
+
+        return self._sample()
+
+    def _sample(self):
+        if not self._recording:
+            return None
+
+        # samples are taken on the tracker's grid and arrive sample_delay later
+        sample_time = np.floor((core.getTime() - self.sample_delay) * self.sampling_rate) / self.sampling_rate
+
+        if self._saccade_at is not None and sample_time >= self._saccade_at:
+            gaze_pos = self.saccade_target
+        else:
+            gaze_pos = self.gaze(sample_time - self._record_start)
+        if gaze_pos is None:
+            return None
+
+        if self.noise:
+            gaze_pos = tuple(np.asarray(gaze_pos) + self.rng.normal(0, self.noise, 2))
+
+        return MockSample(
+            device_time=sample_time * 1000 + self.device_offset,
+            time=sample_time,
+            gaze_x=gaze_pos[0],
+            gaze_y=gaze_pos[1]
+        )
+
+    def getLastGazePosition(self):
+        """
+        Gaze position of the latest sample, None if not recording
+        """
+        sample = self._sample()
+        if sample is None:
+            return None
+
+        return sample.gaze_x, sample.gaze_y
@@ -0,0 +1,89 @@
+#!usr/bin/env python
+"""
+Created at 10/19/26
+@author: devxl
+
+Tests for the data/ registry
+"""
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from registry import Registry, csv_values
+
+
+def write_run(sub_dir, sub_id, ses, velocities):
+    run_file = sub_dir / f"sub-{sub_id}_ses-{ses}_task-saccade.csv"
+    run_file.write_text("target,velocity\n" + "".join(f"top,{v}\n" for v in velocities))
+    return run_file
+
+
+@pytest.fixture
+def registry(tmp_path):
+    with Registry(tmp_path) as reg:
+        yield reg
+
+
+def test_csv_values(tmp_path):
+    run_file = write_run(tmp_path, "01", "1", [1, 1.5, 2.0, 2])
+    assert csv_values(run_file) == {"velocity": ["1", "1.5", "2"]}
+    assert csv_values(run_file, ["missing"]) == {}
+
+
+def test_scan_indexes_velocities(registry):
+    sub_dir = registry.sub_dir("01", "saccade")
+    write_run(sub_dir, "01", "2", [1, 2])
+    (sub_dir / "sub-01_ses-2_task-saccade.log").write_text("log")
+    registry.scan()
+
+    assert [run["kind"] for run in registry.find_runs(kind=None)] == ["data", "log"]
+    assert len(registry.find_runs(ses=2, task="saccade")) == 1
+    assert len(registry.find_runs(ses=2, task="saccade", velocity=2)) == 1
+    assert registry.find_runs(ses=2, task="saccade", velocity=1.5) == []
+
+    # already registered files are skipped
+    registry.scan()
+    assert len(registry.find_runs(kind=None)) == 2
+
+
+def test_add_runs_filters_by_velocity(registry):
+    sub_dir = registry.sub_dir("01", "saccade")
+    slow = write_run(sub_dir, "01", "1", [1])
+    fast = write_run(sub_dir, "01", "2", [2])
+    registry.add_runs("01", "1", "saccade", {"data": slow, "latency": None}, **csv_values(slow))
+    registry.add_runs("01", "2", "saccade", {"data": fast}, **csv_values(fast))
+
+    runs = registry.find_runs(velocity=2.0)
+    assert [run["ses"] for run in runs] == ["2"]
+    assert runs[0]["abs_path"] == fast
+
+
+def test_verify(registry):
+    sub_dir = registry.sub_dir("01", "saccade")
+    changed = write_run(sub_dir, "01", "1", [1])
+    removed = write_run(sub_dir, "01", "2", [1])
+    registry.scan()
+    assert registry.verify() == []
+
+    changed.write_text("target,velocity\nbot,2\n")
+    removed.unlink()
+    assert sorted(registry.verify()) == [
+        "sub-01/saccade/sub-01_ses-1_task-saccade.csv",
+        "sub-01/saccade/sub-01_ses-2_task-saccade.csv",
+    ]
+
+
+def test_export_participants(registry, tmp_path):
+    registry.add_session("02", "1", "saccade", date="2026_Oct_19", age=22, sex="Female", netid="")
+    registry.add_session("02", "2", "saccade", date="2026_Oct_26")
+    registry.add_participant("01")
+    registry.export_participants()
+
+    lines = (tmp_path / "participants.tsv").read_text().splitlines()
+    assert lines == [
+        "participant_id\tnetid\tinitials\tage\tsex\thandedness\tvision\tdate",
+        "sub-01\tn/a\tn/a\tn/a\tn/a\tn/a\tn/a\tn/a",
+        "sub-02\tn/a\tn/a\t22\tFemale\tn/a\tn/a\t2026_Oct_19",
+    ]
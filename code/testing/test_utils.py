@@ -0,0 +1,50 @@
+#!usr/bin/env python
+"""
+Created at 10/19/26
+@author: devxl
+
+Tests for the tracker sample helpers
+"""
+from collections import namedtuple
+from pathlib import Path
+import sys
+
+import pytest
+
+pytest.importorskip("psychopy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils import read_sample, sample_gaze
+
+MonocularSample = namedtuple("MonocularSample", ["device_time", "time", "status", "gaze_x", "gaze_y"])
+BinocularSample = namedtuple(
+    "BinocularSample", ["device_time", "time", "status", "left_gaze_x", "left_gaze_y", "right_gaze_x", "right_gaze_y"]
+)
+
+
+def test_read_sample_keeps_named_samples():
+    sample = MonocularSample(1000.0, 1.0, 0, 10.0, -5.0)
+    assert read_sample(sample) is sample
+    assert read_sample(None) is None
+
+
+def test_monocular_gaze():
+    assert sample_gaze(MonocularSample(1000.0, 1.0, 0, 10.0, -5.0)) == (10.0, -5.0)
+
+
+def test_monocular_missing_data():
+    # the EyeLink writes UNDEFINED (0) into the gaze of a missing sample, which would land on the fixation dot
+    sample = read_sample(MonocularSample(1000.0, 1.0, 2, 0, 0))
+    assert sample_gaze(sample) is None
+
+
+def test_binocular_right_eye():
+    assert sample_gaze(BinocularSample(1000.0, 1.0, 0, 1.0, 2.0, 3.0, 4.0)) == (3.0, 4.0)
+    # left eye missing only
+    assert sample_gaze(BinocularSample(1000.0, 1.0, 20, 0, 0, 3.0, 4.0)) == (3.0, 4.0)
+    # right eye missing
+    assert sample_gaze(BinocularSample(1000.0, 1.0, 2, 1.0, 2.0, 0, 0)) is None
+    assert sample_gaze(BinocularSample(1000.0, 1.0, 22, 0, 0, 0, 0)) is None
+
+
+def test_nan_gaze():
+    assert sample_gaze(MonocularSample(1000.0, 1.0, 0, float("nan"), 0.0)) is None
@@ -90,3 +90,80 @@ def make_motion_seq(path_dur, flash_dur, n_repeat, total_cycle):
 
     return motion_seq
 
+
+
+def make_block_trials(conditions, n_trials, block):
+    """
+    Makes the trial list of a block with n_trials trials, balancing the conditions as much as possible
+
+    Parameters
+    ----------
+    conditions : list
+        condition dicts
+    n_trials : int
+        number of trials in the block
+    block : int
+        block index, used to rotate which conditions fill the remainder so that they even out across blocks
+
+    Returns
+    -------
+    list
+        conditions repeated n_trials // len(conditions) times plus the remaining trials
+    """
+    n_reps, n_extra = divmod(n_trials, len(conditions))
+    extra = [conditions[(block * n_extra + i) % len(conditions)] for i in range(n_extra)]
+
+    return conditions * n_reps + extra
+
+
+def read_sample(sample):
+    """
+    Returns a tracker sample with named fields
+
+    ioHub's client hands getLastSample() back as the raw event list, which is converted with ioHub's own event
+    classes. Samples that already have named fields (e.g. from the mock tracker) are returned as they are.
+
+    Parameters
+    ----------
+    sample
+        result of tracker.getLastSample(), None if there is no sample
+
+    Returns
+    -------
+    namedtuple or None
+        with at least `time` (ioHub time base), `device_time` and the gaze fields
+    """
+    if sample is None or hasattr(sample, "time"):
+        return sample
+
+    from psychopy.iohub.constants import EventConstants
+    from psychopy.iohub.devices import DeviceEvent
+
+    event_class = EventConstants.getClass(sample[DeviceEvent.EVENT_TYPE_ID_INDEX])
+    return event_class.createEventAsNamedTuple(sample)
+
+
+def sample_gaze(sample):
+    """
+    Gaze position of a sample from read_sample, the right eye's for binocular samples, None if not valid
+
+    The EyeLink marks missing data (blinks, lost track) through the sample's status and writes 0, i.e. the center of
+    the screen, into the gaze fields: 2 for a monocular sample, 20 + 2 for the left + right eye of a binocular one.
+    """
+    if sample is None:
+        return None
+
+    status = getattr(sample, "status", 0)
+    if hasattr(sample, "gaze_x"):
+        if status != 0:
+            return None
+        gaze_pos = (sample.gaze_x, sample.gaze_y)
+    else:
+        if status % 10 == 2:
+            return None
+        gaze_pos = (sample.right_gaze_x, sample.right_gaze_y)
+
+    if any(pos != pos for pos in gaze_pos):  # NaN for missing data
+        return None
+
+    return gaze_pos